@@ -65,14 +65,20 @@ class ContentDetector:
     async def detect(self, request: Request) -> bool:
         try:
             data = await request.json()
+            pattern = self.pattern
             for message in data.get("messages", []):
-                message_content = str(message.get("content", ""))
-                if self.pattern in message_content:
+                content = message.get("content")
+                if not content:
+                    continue
+                # content is usually already a string; only stringify structured content
+                if pattern in (content if isinstance(content, str) else str(content)):
                     return True
             # This is clearly a hack and won't be needed when we get rid of the normalizers and will
             # be able to access the system message directly from the on-wire format
-            system_content = str(data.get("system", ""))
-            if self.pattern in system_content:
+            system_content = data.get("system")
+            if system_content and pattern in (
+                system_content if isinstance(system_content, str) else str(system_content)
+            ):
                 return True
             return False
         except Exception as e:
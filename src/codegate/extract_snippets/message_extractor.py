@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Self
 
@@ -9,6 +10,22 @@ from pygments.lexers import guess_lexer
 
 logger = structlog.get_logger("codegate")
 
+
+@lru_cache(maxsize=1024)
+def _guess_language(content_prefix: str) -> Optional[str]:
+    """
+    Guess the language of a snippet with pygments, caching by content prefix.
+
+    guess_lexer trials a few hundred lexers and is by far the slowest part of
+    extraction; during streaming the same snippet is re-guessed as it grows,
+    so keying on a fixed-size prefix makes those repeats cache hits.
+    """
+    lexer = guess_lexer(content_prefix)
+    if lexer and lexer.name:
+        return lexer.name.lower()
+    return None
+
+
 CODE_BLOCK_PATTERN = re.compile(
     r"```"  # Opening backticks, no whitespace after backticks and before language
     r"(?:(?P<language>[a-zA-Z0-9_+-]+)\s+)?"  # Language must be followed by whitespace if present
@@ -134,37 +151,37 @@ class CodeSnippet(BaseModel):
         )
 
 
+# Single mapping from bare extension / short language token to language name;
+# serves both filepath- and message-based lookups.
+_EXT_TO_LANG = {
+    "py": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "tsx": "typescript",
+    "go": "go",
+    "rs": "rust",
+    "java": "java",
+}
+
+
+_AVAILABLE_LANGUAGES = frozenset(
+    {
+        "sh",
+        "bash",
+        "python",
+        "javascript",
+        "typescript",
+        "go",
+        "rust",
+        "java",
+    }
+)
+
+
 class CodeSnippetExtractor(ABC):
 
     def __init__(self):
-        self._extension_mapping = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".tsx": "typescript",
-            ".go": "go",
-            ".rs": "rust",
-            ".java": "java",
-        }
-        self._language_mapping = {
-            "py": "python",
-            "js": "javascript",
-            "ts": "typescript",
-            "tsx": "typescript",
-            "go": "go",
-            "rs": "rust",
-            "java": "java",
-        }
-        self._available_languages = [
-            "sh",
-            "bash",
-            "python",
-            "javascript",
-            "typescript",
-            "go",
-            "rust",
-            "java",
-        ]  # noqa: E501
+        self._available_languages = _AVAILABLE_LANGUAGES
 
     @property
     @abstractmethod
@@ -203,10 +220,9 @@ class CodeSnippetExtractor(ABC):
             Determined language based on file extension
         """
 
-        # Get the file extension
-        path_filename = Path(filepath)
-        file_extension = path_filename.suffix.lower()
-        return self._extension_mapping.get(file_extension, None)
+        # rpartition avoids the Path construction; anything without a dot
+        # yields a token that simply misses the mapping
+        return _EXT_TO_LANG.get(filepath.rpartition(".")[2].lower())
 
     def _ecosystem_from_message(self, message: str):
         """
@@ -220,7 +236,7 @@ class CodeSnippetExtractor(ABC):
         Returns:
             Determined language based on message content
         """
-        return self._language_mapping.get(message, message)
+        return _EXT_TO_LANG.get(message, message)
 
     def _get_snippet_for_match(self, match: re.Match) -> CodeSnippet:
         matched_snippet = self._get_match_pattern_snippet(match)
@@ -252,12 +268,10 @@ class CodeSnippetExtractor(ABC):
                 lang = self._ecosystem_from_filepath(matched_snippet.filename)
             if lang is None:
                 # try to guess it from the code
-                lexer = guess_lexer(matched_snippet.content)
-                if lexer and lexer.name:
-                    lang = lexer.name.lower()
-                    # only add available languages
-                    if lang not in self._available_languages:
-                        lang = None
+                lang = _guess_language(matched_snippet.content[:256])
+                # only add available languages
+                if lang not in self._available_languages:
+                    lang = None
 
         # just correct the typescript exception
         lang_map = {"typescript": "javascript"}
@@ -55,6 +55,10 @@ class ModelRoute:
 class MuxingRuleMatcher(ABC):
     """Base class for matching muxing rules."""
 
+    # Relative cost of evaluating this matcher. Used to order rules cheapest-first
+    # whenever reordering does not change the first-match-wins semantics.
+    _cost: int = 1
+
     def __init__(self, route: ModelRoute, mux_rule: mux_models.MuxRule):
         self._route = route
         self._mux_rule = mux_rule
@@ -99,6 +103,8 @@ class MuxingMatcherFactory:
 class CatchAllMuxingRuleMatcher(MuxingRuleMatcher):
     """A catch all muxing rule matcher."""
 
+    _cost = 0
+
     def match(self, thing_to_match: mux_models.ThingToMatchMux) -> bool:
         logger.info("Catch all rule matched")
         return True
@@ -192,7 +198,40 @@ class MuxingRulesinWorkspaces:
     async def set_ws_rules(self, workspace_name: str, rules: List[MuxingRuleMatcher]) -> None:
         """Set the rules for the given workspace."""
         async with self._lock:
-            self._ws_rules[workspace_name] = rules
+            self._ws_rules[workspace_name] = self._order_rules_by_cost(rules)
+
+    @staticmethod
+    def _order_rules_by_cost(rules: List[MuxingRuleMatcher]) -> List[MuxingRuleMatcher]:
+        """
+        Reorder the rules so the cheap matchers run first where it is safe to do so.
+
+        Rule order defines priority (first match wins), so we cannot sort globally.
+        Two transformations preserve the semantics:
+        - A catch-all rule always matches, so any rule after the first catch-all is
+          unreachable and can be dropped.
+        - Consecutive rules routing to the same destination can be evaluated in any
+          order, so we stable-sort those runs by matcher cost to avoid expensive
+          filename extraction when a cheaper matcher in the run would match anyway.
+        """
+        reachable_rules = []
+        for rule in rules:
+            reachable_rules.append(rule)
+            if isinstance(rule, CatchAllMuxingRuleMatcher):
+                break
+
+        ordered_rules: List[MuxingRuleMatcher] = []
+        same_destination_run: List[MuxingRuleMatcher] = []
+        run_destination = None
+        for rule in reachable_rules:
+            destination = rule.destination()
+            destination_key = (destination.model.provider_endpoint_id, destination.model.name)
+            if destination_key != run_destination:
+                ordered_rules.extend(sorted(same_destination_run, key=lambda r: r._cost))
+                same_destination_run = []
+                run_destination = destination_key
+            same_destination_run.append(rule)
+        ordered_rules.extend(sorted(same_destination_run, key=lambda r: r._cost))
+        return ordered_rules
 
     async def delete_ws_rules(self, workspace_name: str) -> None:
         """Delete the rules for the given workspace."""
@@ -15,12 +15,19 @@ from codegate.pipeline.sensitive_data.manager import SensitiveDataManager
 
 logger = structlog.get_logger("codegate")
 
+# Bound once so the hot recording paths skip the module attribute lookups
+_utcnow = datetime.datetime.now
+_UTC = datetime.timezone.utc
 
-@dataclass
+
+@dataclass(slots=True)
 class PipelineSensitiveData:
     manager: SensitiveDataManager
     session_id: str
     model: Optional[str] = None
+    api_key: Optional[str] = None
+    provider: Optional[str] = None
+    api_base: Optional[str] = None
 
     def secure_cleanup(self):
         """Securely cleanup sensitive data for this session"""
@@ -31,7 +38,7 @@ class PipelineSensitiveData:
         self.model = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineContext:
     metadata: Dict[str, Any] = field(default_factory=dict)
     sensitive: Optional[PipelineSensitiveData] = field(default_factory=lambda: None)
@@ -48,6 +55,12 @@ class PipelineContext:
     pii_found: bool = False
     client: ClientType = ClientType.GENERIC
 
+    def _ensure_prompt_id(self) -> str:
+        """Lazily generate the prompt id the first time it is needed."""
+        if self.prompt_id is None:
+            self.prompt_id = str(uuid.uuid4())
+        return self.prompt_id
+
     def add_alert(
         self,
         step_name: str,
@@ -58,9 +71,6 @@ class PipelineContext:
         """
         Add an alert to the pipeline step alerts_raised.
         """
-        if self.prompt_id is None:
-            self.prompt_id = str(uuid.uuid4())
-
         if not code_snippet and not trigger_string:
             logger.warning("No code snippet or trigger string provided for alert. Will not create")
             return
@@ -69,13 +79,13 @@ class PipelineContext:
 
         self.alerts_raised.append(
             Alert(
-                id=str(uuid.uuid4()),
-                prompt_id=self.prompt_id,
+                id=uuid.uuid4().hex,
+                prompt_id=self._ensure_prompt_id(),
                 code_snippet=code_snippet_str,
                 trigger_string=trigger_string,
                 trigger_type=step_name,
                 trigger_category=severity_category.value,
-                timestamp=datetime.datetime.now(datetime.timezone.utc),
+                timestamp=_utcnow(_UTC),
             )
         )
         # Uncomment the below to debug
@@ -85,12 +95,9 @@ class PipelineContext:
         self, normalized_request: Any, is_fim_request: bool, provider: str
     ) -> None:
         try:
-            if self.prompt_id is None:
-                self.prompt_id = str(uuid.uuid4())
-
             self.input_request = Prompt(
-                id=self.prompt_id,
-                timestamp=datetime.datetime.now(datetime.timezone.utc),
+                id=self._ensure_prompt_id(),
+                timestamp=_utcnow(_UTC),
                 provider=provider,
                 type="fim" if is_fim_request else "chat",
                 request=normalized_request,
@@ -110,13 +117,13 @@ class PipelineContext:
             if isinstance(model_response, BaseModel):
                 output_str = model_response.model_dump_json(exclude_none=True, exclude_unset=True)
             else:
-                output_str = json.dumps(model_response)
+                output_str = json.dumps(model_response, separators=(",", ":"))
 
             self.output_responses.append(
                 Output(
-                    id=str(uuid.uuid4()),
+                    id=uuid.uuid4().hex,
                     prompt_id=self.prompt_id,
-                    timestamp=datetime.datetime.now(datetime.timezone.utc),
+                    timestamp=_utcnow(_UTC),
                     output=output_str,
                 )
             )
@@ -127,7 +134,7 @@ class PipelineContext:
             return
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineResponse:
     """Response generated by a pipeline step"""
 
@@ -136,7 +143,7 @@ class PipelineResponse:
     model: str  # Taken from the original request's model field
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineResult:
     """
     Represents the result of a pipeline operation.
@@ -252,6 +259,9 @@ class InputPipelineInstance:
             session_id=str(uuid.uuid4()),
         )
         self.context.metadata["is_fim"] = is_fim
+        # For Copilot provider=openai. Use a flag to not clash with other places that may use that.
+        # The client is fixed per instance, so resolve the override once here.
+        self._provider_db_override = "copilot" if client == ClientType.COPILOT else None
 
     async def process_request(
         self,
@@ -271,10 +281,7 @@ class InputPipelineInstance:
         self.context.sensitive.provider = provider
         self.context.sensitive.api_base = api_base
 
-        # For Copilot provider=openai. Use a flag to not clash with other places that may use that.
-        provider_db = provider
-        if self.context.client == ClientType.COPILOT:
-            provider_db = "copilot"
+        provider_db = self._provider_db_override or provider
 
         for step in self.pipeline_steps:
             try:
@@ -13,6 +13,16 @@ from codegate.pipeline.base import (
 from codegate.pipeline.cli.commands import CustomInstructions, Version, Workspace
 
 codegate_regex = re.compile(r"^codegate(?:\s+(.*))?", re.IGNORECASE)
+tag_content_regex = re.compile(r"<(task|feedback)>(.*?)</\1>", re.DOTALL)
+xml_tag_regex = re.compile(r"<[^>]+>")
+user_block_regex = re.compile(r"### User:\s*(.*?)(?=\n###|\Z)", re.DOTALL)
+codegate_line_regex = re.compile(r"^codegate\s*(.*?)\s*$", re.IGNORECASE)
+deepseek_regex = re.compile(
+    r"utilizing the DeepSeek Coder model.*?### Instruction:\s*codegate\s+(.*?)\s*### Response:",
+    re.DOTALL | re.IGNORECASE,
+)
+full_line_regex = re.compile(r"^(.*?)$")
+attachment_regex = re.compile(r"<attachment>.*</attachment>", re.DOTALL)
 
 HELP_TEXT = """
 ## CodeGate CLI\n
@@ -26,6 +36,23 @@ Available commands:
 
 NOT_FOUND_TEXT = "Command not found. Use `codegate -h` to see available commands."
 
+_available_commands = None
+
+
+def _get_available_commands():
+    """
+    Build the command dispatch table once. Constructed lazily (not at import)
+    because Workspace/CustomInstructions open the DB layer on instantiation.
+    """
+    global _available_commands
+    if _available_commands is None:
+        _available_commands = {
+            "version": Version().exec,
+            "workspace": Workspace().exec,
+            "custom-instructions": CustomInstructions().exec,
+        }
+    return _available_commands
+
 
 async def codegate_cli(command):
     """
@@ -34,12 +61,7 @@ async def codegate_cli(command):
     if len(command) == 0:
         return HELP_TEXT
 
-    available_commands = {
-        "version": Version().exec,
-        "workspace": Workspace().exec,
-        "custom-instructions": CustomInstructions().exec,
-    }
-    out_func = available_commands.get(command[0])
+    out_func = _get_available_commands().get(command[0])
     if out_func is None:
         if command[0] == "-h":
             return HELP_TEXT
@@ -52,7 +74,7 @@ def _get_cli_from_cline(
     codegate_regex: re.Pattern[str], last_user_message_str: str
 ) -> Optional[re.Match[str]]:
     # Check if there are <task> or <feedback> tags
-    tag_match = re.search(r"<(task|feedback)>(.*?)</\1>", last_user_message_str, re.DOTALL)
+    tag_match = tag_content_regex.search(last_user_message_str)
     if tag_match:
         # Extract the content between the tags
         stripped_message = tag_match.group(2).strip()
@@ -61,7 +83,7 @@ def _get_cli_from_cline(
         stripped_message = last_user_message_str.strip()
 
     # Remove all other XML tags and trim whitespace
-    stripped_message = re.sub(r"<[^>]+>", "", stripped_message).strip()
+    stripped_message = xml_tag_regex.sub("", stripped_message).strip()
 
     # Check if "codegate" is the first word
     match = codegate_regex.match(stripped_message)
@@ -71,25 +93,21 @@ def _get_cli_from_cline(
 
 def _get_cli_from_open_interpreter(last_user_message_str: str) -> Optional[re.Match[str]]:
     # Extract the last "### User:" block
-    user_blocks = re.findall(r"### User:\s*(.*?)(?=\n###|\Z)", last_user_message_str, re.DOTALL)
+    user_blocks = user_block_regex.findall(last_user_message_str)
     last_user_block = user_blocks[-1].strip() if user_blocks else last_user_message_str.strip()
 
     # Match "codegate" only in the last user block or entire input
-    return re.match(r"^codegate\s*(.*?)\s*$", last_user_block, re.IGNORECASE)
+    return codegate_line_regex.match(last_user_block)
 
 
 def _get_cli_from_continue(last_user_message_str: str) -> Optional[re.Match[str]]:
     """
     Continue sends a differently formatted message to the CLI if DeepSeek is used
     """
-    deepseek_match = re.search(
-        r"utilizing the DeepSeek Coder model.*?### Instruction:\s*codegate\s+(.*?)\s*### Response:",
-        last_user_message_str,
-        re.DOTALL | re.IGNORECASE,
-    )
+    deepseek_match = deepseek_regex.search(last_user_message_str)
     if deepseek_match:
         command = deepseek_match.group(1).strip()
-        return re.match(r"^(.*?)$", command)  # This creates a match object with the command
+        return full_line_regex.match(command)  # This creates a match object with the command
 
     return codegate_regex.match(last_user_message_str)
 
@@ -107,9 +125,7 @@ def _get_cli_from_copilot(last_user_message_str: str) -> Optional[re.Match[str]]
     Returns:
         Optional[re.Match[str]]: A regex match object if command is found, None otherwise
     """
-    cleaned_text = re.sub(
-        r"<attachment>.*</attachment>", "", last_user_message_str, flags=re.DOTALL
-    )
+    cleaned_text = attachment_regex.sub("", last_user_message_str)
     return codegate_regex.match(cleaned_text.strip())
 
 
@@ -145,6 +161,11 @@ class CodegateCli(PipelineStep):
             last_user_message_str, _ = last_user_message
             last_user_message_str = last_user_message_str.strip()
 
+            # Cheap check first: if "codegate" appears nowhere in the message, none of
+            # the client-specific matchers below can match, so skip their regex work.
+            if "codegate" not in last_user_message_str.lower():
+                return PipelineResult(request=request, context=context)
+
             # Check client-specific matchers first
             if context.client in [ClientType.CLINE, ClientType.KODU]:
                 match = _get_cli_from_cline(codegate_regex, last_user_message_str)
@@ -162,22 +183,27 @@ class CodegateCli(PipelineStep):
                 command = match.group(1) or ""
                 command = command.strip()
 
-                # Process the command
-                args = shlex.split(f"codegate {command}")
-                if args:
-                    context.shortcut_response = True
-                    cmd_out = await codegate_cli(args[1:])
-                    if context.client in [ClientType.CLINE, ClientType.KODU]:
-                        cmd_out = (
-                            f"<attempt_completion><result>{cmd_out}</result></attempt_completion>\n"
-                        )
-
-                    return PipelineResult(
-                        response=PipelineResponse(
-                            step_name=self.name, content=cmd_out, model=request.get_model()
-                        ),
-                        context=context,
+                # Process the command. The leading "codegate" token is already
+                # consumed by the regex; only split the tail. shlex is kept for
+                # quoted arguments but skipped on the common unquoted path.
+                if '"' in command or "'" in command:
+                    args = shlex.split(command)
+                else:
+                    args = command.split()
+
+                context.shortcut_response = True
+                cmd_out = await codegate_cli(args)
+                if context.client in [ClientType.CLINE, ClientType.KODU]:
+                    cmd_out = (
+                        f"<attempt_completion><result>{cmd_out}</result></attempt_completion>\n"
                     )
 
+                return PipelineResult(
+                    response=PipelineResponse(
+                        step_name=self.name, content=cmd_out, model=request.get_model()
+                    ),
+                    context=context,
+                )
+
         # Fall through
         return PipelineResult(request=request, context=context)
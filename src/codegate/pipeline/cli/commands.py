@@ -21,6 +21,11 @@ class NoSubcommandError(Exception):
 # reply the same to concurrent requests. Needed for Copilot.
 command_cache = TTLCache(maxsize=10, ttl=1)
 
+# Flag sets are shared constants so the parsing loop gets O(1) membership
+# checks without re-materializing a list per call.
+_NO_FLAGS = frozenset()
+_WORKSPACE_FLAGS = frozenset({"-w"})
+
 
 class CodegateCommand(ABC):
     @abstractmethod
@@ -80,7 +85,8 @@ class CodegateCommand(ABC):
 
 
 class Version(CodegateCommand):
-    async def run(self, args: List[str]) -> str:
+    @staticmethod
+    async def run(args: List[str]) -> str:
         return f"CodeGate version: {__version__}"
 
     @property
@@ -108,10 +114,10 @@ class CodegateCommandSubcommand(CodegateCommand):
 
     @property
     @abstractmethod
-    def flags(self) -> List[str]:
+    def flags(self) -> frozenset[str]:
         """
-        List of flags that the command accepts.
-        Example: ["-w", "-f"]
+        Flags that the command accepts.
+        Example: frozenset({"-w", "-f"})
         """
         pass
 
@@ -121,12 +127,14 @@ class CodegateCommandSubcommand(CodegateCommand):
         The flags are expected to be at the start of the args and are optional.
         """
         i = 0
+        num_args = len(args)
         read_flags = {}
+        flags = self.flags
         # Parse all recognized flags at the start
-        while i < len(args):
-            if args[i] in self.flags:
+        while i < num_args:
+            if args[i] in flags:
                 flag_name = args[i]
-                if i + 1 >= len(args):
+                if i + 1 >= num_args:
                     raise NoFlagValueError(f"Flag {flag_name} needs a value, but none provided.")
                 read_flags[flag_name] = args[i + 1]
                 i += 2
@@ -135,7 +143,7 @@ class CodegateCommandSubcommand(CodegateCommand):
                 # we assume it's the subcommand
                 break
 
-        if i >= len(args):
+        if i >= num_args:
             raise NoSubcommandError("No subcommand found after optional flags.")
 
         subcommand = args[i]
@@ -175,43 +183,44 @@ class CodegateCommandSubcommand(CodegateCommand):
 class Workspace(CodegateCommandSubcommand):
     def __init__(self):
         self.workspace_crud = crud.WorkspaceCrud()
+        # Built once; the subcommands property used to allocate a new dict and
+        # fresh bound methods on every dispatch.
+        self._subcommands = {
+            "list": self._list_workspaces,
+            "add": self._add_workspace,
+            "activate": self._activate_workspace,
+            "archive": self._archive_workspace,
+            "rename": self._rename_workspace,
+            "list-archived": self._list_archived_workspaces,
+            "restore": self._restore_workspace,
+            "delete-archived": self._delete_archived_workspace,
+        }
 
     @property
     def command_name(self) -> str:
         return "workspace"
 
     @property
-    def flags(self) -> List[str]:
+    def flags(self) -> frozenset[str]:
         """
         No flags for the workspace command
         """
-        return []
+        return _NO_FLAGS
 
     @property
     def subcommands(self) -> Dict[str, Callable[[List[str]], Awaitable[str]]]:
-        return {
-            "list": self._list_workspaces,
-            "add": self._add_workspace,
-            "activate": self._activate_workspace,
-            "archive": self._archive_workspace,
-            "rename": self._rename_workspace,
-            "list-archived": self._list_archived_workspaces,
-            "restore": self._restore_workspace,
-            "delete-archived": self._delete_archived_workspace,
-        }
+        return self._subcommands
 
     async def _list_workspaces(self, flags: Dict[str, str], args: List[str]) -> str:
         """
         List all workspaces
         """
         workspaces = await self.workspace_crud.get_workspaces()
-        respond_str = ""
+        lines = []
         for workspace in workspaces:
-            respond_str += f"- {workspace.name}"
-            if workspace.session_id:
-                respond_str += " **(active)**"
-            respond_str += "\n"
-        return respond_str
+            suffix = " **(active)**\n" if workspace.session_id else "\n"
+            lines.append(f"- {workspace.name}{suffix}")
+        return "".join(lines)
 
     async def _add_workspace(self, flags: Dict[str, str], args: List[str]) -> str:
         """
@@ -315,10 +324,7 @@ class Workspace(CodegateCommandSubcommand):
         List all archived workspaces
         """
         workspaces = await self.workspace_crud.get_archived_workspaces()
-        respond_str = ""
-        for workspace in workspaces:
-            respond_str += f"- {workspace.name}\n"
-        return respond_str
+        return "".join(f"- {workspace.name}\n" for workspace in workspaces)
 
     async def _restore_workspace(self, flags: Dict[str, str], args: List[str]) -> str:
         """
@@ -410,26 +416,27 @@ class Workspace(CodegateCommandSubcommand):
 class CustomInstructions(CodegateCommandSubcommand):
     def __init__(self):
         self.workspace_crud = crud.WorkspaceCrud()
+        self._subcommands = {
+            "set": self._set_custom_instructions,
+            "show": self._show_custom_instructions,
+            "reset": self._reset_custom_instructions,
+        }
 
     @property
     def command_name(self) -> str:
         return "custom-instructions"
 
     @property
-    def flags(self) -> List[str]:
+    def flags(self) -> frozenset[str]:
         """
         Flags for the custom-instructions command.
         -w: Workspace name
         """
-        return ["-w"]
+        return _WORKSPACE_FLAGS
 
     @property
     def subcommands(self) -> Dict[str, Callable[[List[str]], Awaitable[str]]]:
-        return {
-            "set": self._set_custom_instructions,
-            "show": self._show_custom_instructions,
-            "reset": self._reset_custom_instructions,
-        }
+        return self._subcommands
 
     async def _set_custom_instructions(self, flags: Dict[str, str], args: List[str]) -> str:
         """
@@ -1,9 +1,10 @@
-import itertools
+import asyncio
 import json
 from typing import Any
 
 import regex as re
 import structlog
+from cachetools import TTLCache
 
 from codegate.clients.clients import ClientType
 from codegate.db.models import AlertSeverity
@@ -20,10 +21,18 @@ from codegate.utils.utils import generate_vector_string
 logger = structlog.get_logger("codegate")
 
 
-# Pre-compiled regex patterns for performance
-markdown_code_block = re.compile(r"```.*?```", flags=re.DOTALL)
-markdown_file_listing = re.compile(r"⋮...*?⋮...\n\n", flags=re.DOTALL)
-environment_details = re.compile(r"<environment_details>.*?</environment_details>", flags=re.DOTALL)
+# Pre-compiled regex patterns for performance.
+# Code blocks, file listings and environment details are stripped in a single
+# pass; the alternation avoids walking the message three times.
+message_cleanup = re.compile(
+    r"```.*?```|⋮...*?⋮...\n\n|<environment_details>.*?</environment_details>",
+    flags=re.DOTALL,
+)
+message_split = re.compile(r"</?task>|\n|\\n")
+task_block = re.compile(r"<task>\s*(.*?)\s*</task>(.*)", flags=re.DOTALL)
+
+# Clients that wrap the user query in a <task> block
+xml_task_clients = frozenset({ClientType.CLINE, ClientType.KODU})
 
 
 class CodegateContextRetriever(PipelineStep):
@@ -46,6 +55,10 @@ class CodegateContextRetriever(PipelineStep):
         """
         self.storage_engine = storage_engine or StorageEngine()
         self.package_extractor = package_extractor or PackageExtractor
+        # Identical query lines come back repeatedly across retries and
+        # consecutive turns; keep recent vector-search results for a while so
+        # they skip the embedding + sqlite-vec round-trip.
+        self._search_cache = TTLCache(maxsize=1024, ttl=300)
 
     @property
     def name(self) -> str:
@@ -57,7 +70,7 @@ class CodegateContextRetriever(PipelineStep):
     def generate_context_str(
         self, objects: list[object], context: PipelineContext, snippet_map: dict
     ) -> str:
-        context_str = ""
+        context_lines = []
         matched_packages = []
         for obj in objects:
             # The object is already a dictionary with 'properties'
@@ -70,18 +83,26 @@ class CodegateContextRetriever(PipelineStep):
             # Add one alert for each package found
             context.add_alert(
                 self.name,
-                trigger_string=json.dumps(package_obj),
+                trigger_string=json.dumps(package_obj, separators=(",", ":")),
                 severity_category=AlertSeverity.CRITICAL,
                 code_snippet=code_snippet,
             )
-            package_str = generate_vector_string(package_obj)
-            context_str += package_str + "\n"
+            context_lines.append(generate_vector_string(package_obj) + "\n")
 
         if matched_packages:
             logger.debug(
                 "Found matching packages in sqlite-vec database", matched_packages=matched_packages
             )
-        return context_str
+        return "".join(context_lines)
+
+    async def _search_for_query(self, query: str) -> list[object]:
+        try:
+            return self._search_cache[query]
+        except KeyError:
+            pass
+        result = await self.storage_engine.search(query=query, distance=0.5, limit=100)
+        self._search_cache[query] = result
+        return result
 
     async def process(self, request: Any, context: PipelineContext) -> PipelineResult:  # noqa: C901
         """
@@ -100,43 +121,56 @@ class CodegateContextRetriever(PipelineStep):
         bad_snippet_packages = []
         snippet_map = {}
         if snippets and len(snippets) > 0:
-            snippet_language = snippets[0].language
-            # Collect all packages referenced in the snippets
-            snippet_packages = []
+            # Group the referenced packages by snippet language; mixed-language
+            # messages must not search e.g. JS packages in the Python index.
+            packages_by_language: dict[str, list[str]] = {}
             for snippet in snippets:
                 extracted_packages = PackageExtractor.extract_packages(
                     snippet.code, snippet.language
                 )
-                snippet_packages.extend(extracted_packages)
+                packages_by_language.setdefault(snippet.language, []).extend(extracted_packages)
                 for package in extracted_packages:
                     snippet_map[package] = snippet
 
             logger.info(
-                f"Found {len(snippet_packages)} packages "
-                f"for language {snippet_language} in code snippets."
+                f"Found {len(snippet_map)} packages for languages "
+                f"{list(packages_by_language.keys())} in code snippets."
             )
-            # Find bad packages in the snippets
-            bad_snippet_packages = await self.storage_engine.search(
-                language=snippet_language, packages=snippet_packages
-            )  # type: ignore
+            # Find bad packages in the snippets, one search per language.
+            # Snippets for the same language often import the same packages;
+            # dedupe before querying so the IN filter stays small.
+            language_results = await asyncio.gather(
+                *(
+                    self.storage_engine.search(
+                        language=language, packages=list({p.lower() for p in packages})
+                    )
+                    for language, packages in packages_by_language.items()
+                    if packages
+                )
+            )
+            for found_packages in language_results:
+                if found_packages:
+                    bad_snippet_packages.extend(found_packages)
             logger.info(f"Found {len(bad_snippet_packages)} bad packages in code snippets.")
 
         # Remove code snippets and file listing from the user messages and search for bad packages
         # in the rest of the user query/messsages
-        user_messages = markdown_code_block.sub("", user_message)
-        user_messages = markdown_file_listing.sub("", user_messages)
-        user_messages = environment_details.sub("", user_messages)
+        user_messages = message_cleanup.sub("", user_message)
 
         # split messages into double newlines, to avoid passing so many content in the search
-        split_messages = re.split(r"</?task>|\n|\\n", user_messages)
-        collected_bad_packages = []
-        for item_message in filter(None, map(str.strip, split_messages)):
-            # Vector search to find bad packages
-            bad_packages = await self.storage_engine.search(
-                query=item_message,
-                distance=0.5,
-                limit=100,
+        split_messages = message_split.split(user_messages)
+        # Pasted content often repeats lines (imports, boilerplate); deduplicate
+        # before searching so each unique line is embedded only once.
+        queries = list(
+            dict.fromkeys(
+                item_message for item_message in map(str.strip, split_messages) if item_message
             )
+        )
+        # Vector search to find bad packages. The searches are independent,
+        # so issue them concurrently instead of one round-trip per line.
+        search_results = await asyncio.gather(*(self._search_for_query(query) for query in queries))
+        collected_bad_packages = []
+        for bad_packages in search_results:
             if bad_packages and len(bad_packages) > 0:
                 collected_bad_packages.extend(bad_packages)
 
@@ -154,20 +188,26 @@ class CodegateContextRetriever(PipelineStep):
             context.bad_packages_found = True
 
             # perform replacement in all the messages starting from this index
-            messages = request.get_messages()
-            filtered = itertools.dropwhile(lambda x: x[0] < last_user_idx, enumerate(messages))
-            for i, message in filtered:
-                message_str = ""
-                for content in message.get_content():
+            use_task_block = context.client in xml_task_clients
+            messages = list(request.get_messages())
+            for i, message in enumerate(messages[last_user_idx:], start=last_user_idx):
+                # Materialize the contents once; get_content() is a generator and
+                # is needed again below to write the updated text back.
+                contents = list(message.get_content())
+                if not contents:
+                    continue
+                message_parts = []
+                for content in contents:
                     txt = content.get_text()
                     if not txt:
                         logger.debug(f"content has no text: {content}")
                         continue
-                    message_str += txt
+                    message_parts.append(txt)
+                message_str = "".join(message_parts)
                 context_msg = message_str
                 # Add the context to the last user message
-                if context.client in [ClientType.CLINE, ClientType.KODU]:
-                    match = re.search(r"<task>\s*(.*?)\s*</task>(.*)", message_str, re.DOTALL)
+                if use_task_block:
+                    match = task_block.search(message_str)
                     if match:
                         task_content = match.group(1)  # Content within <task>...</task>
                         rest_of_message = match.group(2).strip()  # Content after </task>, if any
@@ -182,8 +222,7 @@ class CodegateContextRetriever(PipelineStep):
                         context_msg = updated_task_content + rest_of_message
                 else:
                     context_msg = f"Context: {context_str} \n\n Query: {message_str}"
-                content = next(message.get_content())
-                content.set_text(context_msg)
+                contents[0].set_text(context_msg)
                 logger.debug("Final context message", context_message=context_msg)
 
             return PipelineResult(request=request, context=context)
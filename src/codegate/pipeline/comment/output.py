@@ -1,7 +1,9 @@
+import string
 from typing import Any, Optional
 from urllib.parse import quote
 
 import structlog
+from cachetools import TTLCache
 
 from codegate.db.models import AlertSeverity
 from codegate.extract_snippets.message_extractor import (
@@ -15,12 +17,43 @@ from codegate.utils.package_extractor import PackageExtractor
 
 logger = structlog.get_logger("codegate")
 
+_URL_TEMPLATE = "https://www.insight.stacklok.com/report/{type}/{name}?utm_source=codegate"
+
+# Translate table that deletes every URL-safe character; an empty result means
+# the name needs no quoting at all, which is the case for most package names.
+_SAFE_NAME_TABLE = str.maketrans("", "", string.ascii_letters + string.digits + "-._~")
+
+
+def _quote_name(name: str) -> str:
+    if not name.translate(_SAFE_NAME_TABLE):
+        return name
+    return quote(name, safe="")
+
 
 class CodeCommentStep(OutputPipelineStep):
     """Pipeline step that adds comments after code blocks"""
 
+    # A new step instance is created per output pipeline (i.e. per stream).
+    # The extractor is stateless and the search cache is only useful if it
+    # survives across streams, so both are shared at class level.
+    _extractor = DefaultCodeSnippetExtractor()
+    _search_cache = TTLCache(maxsize=2000, ttl=300)
+
     def __init__(self):
-        self.extractor = DefaultCodeSnippetExtractor()
+        self.extractor = self._extractor
+        # StorageEngine is a process-wide singleton; hold a reference instead of
+        # re-resolving it on every snippet.
+        self._storage_engine = StorageEngine()
+
+    async def _search_packages(self, language: str, libraries: list[str]) -> list[object]:
+        cache_key = (language, tuple(sorted(libraries)))
+        try:
+            return self._search_cache[cache_key]
+        except KeyError:
+            pass
+        libobjects = await self._storage_engine.search(language=language, packages=libraries)
+        self._search_cache[cache_key] = libobjects
+        return libobjects
 
     @property
     def name(self) -> str:
@@ -57,40 +90,33 @@ class CodeCommentStep(OutputPipelineStep):
             return comment
 
         # Check if any of the snippet libraries is a bad package
-        storage_engine = StorageEngine()
-        libobjects = await storage_engine.search(
-            language=snippet.language, packages=snippet.libraries
-        )
+        libobjects = await self._search_packages(snippet.language, snippet.libraries)
         logger.info(f"Found {len(libobjects)} libraries in the storage engine")
 
         # If no bad packages are found, just return empty comment
         if len(libobjects) == 0:
             return ""
 
-        # Otherwise, generate codegate warning message
-        warnings = []
-
-        # Use libobjects to generate a CSV list of bad libraries
-        libobjects_text = ", ".join([f"""`{lib["properties"]["name"]}`""" for lib in libobjects])
-
+        # Otherwise, generate codegate warning message. Collect all the pieces
+        # and join once at the end instead of growing intermediate strings.
+        parts = [
+            comment,
+            "\n\nWarning: CodeGate detected one or more potentially malicious or "
+            "archived packages: ",
+            # CSV list of bad libraries
+            ", ".join(f"`{lib['properties']['name']}`" for lib in libobjects),
+            "\n\n### 🚨 Warnings\n",
+        ]
         for lib in libobjects:
-            lib_name = lib["properties"]["name"]
-            lib_type = lib["properties"]["type"]
-            lib_status = lib["properties"]["status"]
-            lib_url = (
-                f"https://www.insight.stacklok.com/report/{lib_type}/"
-                f"{quote(lib_name, safe='')}?utm_source=codegate"
+            props = lib["properties"]
+            lib_name = props["name"]
+            lib_url = _URL_TEMPLATE.format(type=props["type"], name=_quote_name(lib_name))
+            parts.append(
+                f"- The package `{lib_name}` is marked as **{props['status']}**.\n"
+                f"- More information: [{lib_url}]({lib_url})\n\n"
             )
 
-            warnings.append(
-                f"- The package `{lib_name}` is marked as **{lib_status}**.\n"
-                f"- More information: [{lib_url}]({lib_url})\n"
-            )
-
-        # Add a codegate warning for the bad packages found in the snippet
-        comment = f"{comment}\n\nWarning: CodeGate detected one or more potentially malicious or \
-archived packages: {libobjects_text}\n"
-        comment += "\n### 🚨 Warnings\n" + "\n".join(warnings) + "\n"
+        comment = "".join(parts)
 
         # Add an alert to the context
         context.add_alert(
@@ -101,14 +127,21 @@ archived packages: {libobjects_text}\n"
 
     def _split_chunk_at_code_end(self, content: str) -> tuple[str, str]:
         """Split content at the end of a code block (```)"""
-        lines = content.split("\n")
-        for i, line in enumerate(lines):
-            if line.strip() == "```":
+        # Scan with str.find instead of splitting into a line list; chunks are
+        # mostly fence-free, so the common case is a single C-level scan.
+        search_from = 0
+        while True:
+            idx = content.find("```", search_from)
+            if idx < 0:
+                return content, ""
+            line_start = content.rfind("\n", 0, idx) + 1
+            line_end = content.find("\n", idx)
+            if line_end < 0:
+                line_end = len(content)
+            if content[line_start:line_end].strip() == "```":
                 # Return content up to and including ```, and the rest
-                before = "\n".join(lines[: i + 1])
-                after = "\n".join(lines[i + 1 :])
-                return before, after
-        return content, ""
+                return content[:line_end], content[line_end + 1 :]
+            search_from = line_end
 
     async def process_chunk(
         self,
@@ -118,41 +151,72 @@ archived packages: {libobjects_text}\n"
     ) -> list[Any]:
         """Process a single chunk of the stream"""
         for content in chunk.get_content():
-            # Get current content plus this new chunk
             text = content.get_text()
-            current_content = "".join(context.processed_content + [text if text else ""])
-
-            # Extract snippets from current content
-            snippets = self.extractor.extract_snippets(current_content)
-
-            # Check if a new snippet has been completed
-            if len(snippets) > len(context.snippets):
-                # Get the last completed snippet
-                last_snippet = snippets[-1]
-                context.snippets = snippets  # Update context with new snippets
-
-                # Split the chunk content if needed
-                text = content.get_text()
-                before, after = self._split_chunk_at_code_end(text if text else "")
 
+            # A snippet can only have just been completed if this chunk
+            # contributed at least part of a closing fence; for plain prose
+            # chunks (the vast majority of streamed tokens) skip the regex
+            # scan entirely.
+            if not text or "`" not in text:
+                continue
+
+            # Reconstruct only the unscanned tail of the stream plus this new
+            # chunk. Walking the piece list from the end keeps the join
+            # proportional to the tail length rather than the whole stream.
+            needed = context.processed_len - context.scan_offset
+            pieces = []
+            for piece in reversed(context.processed_content):
+                if needed <= 0:
+                    break
+                pieces.append(piece)
+                needed -= len(piece)
+            pieces.reverse()
+            current_tail = "".join(pieces)
+            if needed < 0:
+                # The oldest collected piece straddles the scan offset
+                current_tail = current_tail[-needed:]
+            current_tail += text
+
+            # Extract snippets from the unscanned tail only. The scan offset
+            # always sits outside any code block (right after the last closing
+            # fence), so a growing open block is still scanned in full while
+            # already-handled snippets are never re-matched.
+            new_snippets = self.extractor.extract_snippets(current_tail)
+
+            # Check if new snippets have been completed
+            if new_snippets:
+                # Should a single chunk close more than one block, emit one
+                # comment per completed snippet, splitting the chunk text at
+                # each closing fence so every comment lands directly after its
+                # own block.
                 chunks = []
-
-                # Add the chunk with content up to the end of code block
-                if before:
-                    chunks.append(self._create_chunk(chunk, before))
-                    # complete_comment += before
-
-                comment = await self._snippet_comment(last_snippet, input_context)
-                chunks.append(
-                    self._create_chunk(
-                        chunk,
-                        comment,
-                    )
-                )
+                remaining = text
+                emitted_len = 0
+                for snippet in new_snippets:
+                    context.snippets.append(snippet)  # Update context with new snippets
+
+                    # Split the remaining chunk content at this snippet's
+                    # closing fence
+                    before, remaining = self._split_chunk_at_code_end(remaining)
+
+                    # Add the chunk with content up to the end of code block
+                    if before:
+                        chunks.append(self._create_chunk(chunk, before))
+                        emitted_len += len(before)
+
+                    # Everything up to and including the closing fence has
+                    # been consumed; resume future scans after it. Text
+                    # injected below (the comment) lands after this offset, so
+                    # it stays valid.
+                    context.scan_offset = context.processed_len + emitted_len
+
+                    comment = await self._snippet_comment(snippet, input_context)
+                    chunks.append(self._create_chunk(chunk, comment))
+                    emitted_len += len(comment)
 
                 # Add the remaining content if any
-                if after:
-                    chunks.append(self._create_chunk(chunk, after))
+                if remaining:
+                    chunks.append(self._create_chunk(chunk, remaining))
 
                 return chunks
 
@@ -7,6 +7,7 @@ from codegate.pipeline.cli.cli import CodegateCli
 from codegate.pipeline.codegate_context_retriever.codegate import CodegateContextRetriever
 from codegate.pipeline.comment.output import CodeCommentStep
 from codegate.pipeline.output import OutputPipelineProcessor, OutputPipelineStep
+from codegate.pipeline.pii.analyzer import PiiAnalyzer
 from codegate.pipeline.pii.pii import (
     CodegatePii,
     PiiRedactionNotifier,
@@ -24,9 +25,19 @@ from codegate.pipeline.system_prompt.codegate import SystemPrompt
 class PipelineFactory:
     def __init__(self, sensitive_data_manager: SensitiveDataManager):
         self.sensitive_data_manager = sensitive_data_manager
+        # Resolve the prompt config once; it does not change at runtime and
+        # create_input_pipeline runs per request.
+        prompts = Config.get_config().prompts
+        self._default_chat_prompt = prompts.default_chat
+        self._client_prompts = prompts.client_prompts
+        # Warm up the PII analyzer at construction (i.e. process startup) so
+        # the first request does not pay the spaCy model load.
+        PiiAnalyzer.get_instance()
 
-    def create_input_pipeline(self, client_type: ClientType) -> SequentialPipelineProcessor:
-        input_steps: List[PipelineStep] = [
+        # The steps themselves are stateless - per-request state lives in
+        # PipelineContext/OutputPipelineContext - so build them once and share
+        # the lists across requests instead of re-instantiating per call.
+        self._input_steps: List[PipelineStep] = [
             # make sure that this step is always first in the pipeline
             # the other steps might send the request to a LLM for it to be analyzed
             # and without obfuscating the secrets, we'd leak the secrets during those
@@ -35,42 +46,42 @@ class PipelineFactory:
             CodegatePii(self.sensitive_data_manager),
             CodegateCli(),
             CodegateContextRetriever(),
-            SystemPrompt(
-                Config.get_config().prompts.default_chat, Config.get_config().prompts.client_prompts
-            ),
+            SystemPrompt(self._default_chat_prompt, self._client_prompts),
+        ]
+        self._fim_steps: List[PipelineStep] = [
+            CodegateSecrets(),
+            CodegatePii(self.sensitive_data_manager),
+        ]
+        self._output_steps: List[OutputPipelineStep] = [
+            SecretRedactionNotifier(),
+            SecretUnredactionStep(),
+            PiiRedactionNotifier(),
+            PiiUnRedactionStep(),
+            CodeCommentStep(),
         ]
+        self._fim_output_steps: List[OutputPipelineStep] = [
+            # temporarily disabled
+            # SecretUnredactionStep(),
+        ]
+
+    def create_input_pipeline(self, client_type: ClientType) -> SequentialPipelineProcessor:
         return SequentialPipelineProcessor(
-            input_steps,
+            self._input_steps,
             self.sensitive_data_manager,
             client_type,
             is_fim=False,
         )
 
     def create_fim_pipeline(self, client_type: ClientType) -> SequentialPipelineProcessor:
-        fim_steps: List[PipelineStep] = [
-            CodegateSecrets(),
-            CodegatePii(self.sensitive_data_manager),
-        ]
         return SequentialPipelineProcessor(
-            fim_steps,
+            self._fim_steps,
             self.sensitive_data_manager,
             client_type,
             is_fim=True,
         )
 
     def create_output_pipeline(self) -> OutputPipelineProcessor:
-        output_steps: List[OutputPipelineStep] = [
-            SecretRedactionNotifier(),
-            SecretUnredactionStep(),
-            PiiRedactionNotifier(),
-            PiiUnRedactionStep(),
-            CodeCommentStep(),
-        ]
-        return OutputPipelineProcessor(output_steps)
+        return OutputPipelineProcessor(self._output_steps)
 
     def create_fim_output_pipeline(self) -> OutputPipelineProcessor:
-        fim_output_steps: List[OutputPipelineStep] = [
-            # temporarily disabled
-            # SecretUnredactionStep(),
-        ]
-        return OutputPipelineProcessor(fim_output_steps)
+        return OutputPipelineProcessor(self._fim_output_steps)
@@ -11,6 +11,10 @@ from codegate.pipeline.base import PipelineContext
 
 logger = structlog.get_logger("codegate")
 
+# Sentinel the prefetch task puts on its queue once the upstream stream is
+# exhausted.
+_STREAM_END = object()
+
 
 @dataclass
 class OutputPipelineContext:
@@ -27,8 +31,15 @@ class OutputPipelineContext:
     snippets: List[CodeSnippet] = field(default_factory=list)
     # Store all content that has been processed by the pipeline
     processed_content: List[str] = field(default_factory=list)
+    # Total character count of processed_content, maintained on append so
+    # consumers can address into the stream without joining the whole list
+    processed_len: int = 0
     # partial buffer to store prefixes
     prefix_buffer: str = ""
+    # Offset into the accumulated processed content up to which code snippets
+    # have already been extracted. Lets snippet-scanning steps search only the
+    # unscanned tail instead of re-scanning the whole stream on every chunk.
+    scan_offset: int = 0
 
 
 class OutputPipelineStep(ABC):
@@ -112,6 +123,7 @@ class OutputPipelineInstance:
             text = content.get_text()
             if text:
                 self._context.processed_content.append(text)
+                self._context.processed_len += len(text)
 
     def _record_to_db(self) -> None:
         """
@@ -124,6 +136,22 @@ class OutputPipelineInstance:
         loop = asyncio.get_running_loop()
         loop.create_task(self._db_recorder.record_context(self._input_context))
 
+    @staticmethod
+    async def _prefetch_chunks(stream: AsyncIterator[Any], queue: asyncio.Queue) -> None:
+        """
+        Eagerly pull chunks from the upstream stream into the queue so network
+        reads overlap with pipeline processing of already-received chunks.
+        Exceptions are forwarded through the queue to preserve the consumer's
+        error handling.
+        """
+        try:
+            async for chunk in stream:
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_STREAM_END)
+
     async def process_stream(
         self,
         stream: AsyncIterator[Any],
@@ -133,8 +161,18 @@ class OutputPipelineInstance:
         """
         Process a stream through all pipeline steps
         """
+        # Bounded so a slow client applies backpressure upstream instead of
+        # buffering the whole response in memory.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+        prefetch_task = asyncio.create_task(self._prefetch_chunks(stream, queue))
         try:
-            async for chunk in stream:
+            while True:
+                chunk = await queue.get()
+                if chunk is _STREAM_END:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+
                 # Store chunk content in buffer
                 self._buffer_chunk(chunk)
                 self._input_context.add_output(chunk)
@@ -174,6 +212,7 @@ class OutputPipelineInstance:
             logger.error(f"Error processing stream: {e}", exc_info=e)
             raise e
         finally:
+            prefetch_task.cancel()
             # NOTE: Don't use await in finally block, it will break the stream
             # Don't flush the buffer if we assume we'll call the pipeline again
             if cleanup_sensitive is False:
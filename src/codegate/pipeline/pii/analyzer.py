@@ -1,5 +1,7 @@
+import threading
 from typing import List, Optional
 
+import regex as re
 import structlog
 from presidio_analyzer import AnalyzerEngine
 from presidio_anonymizer import AnonymizerEngine
@@ -9,6 +11,34 @@ from codegate.pipeline.sensitive_data.session_store import SessionStore
 
 logger = structlog.get_logger("codegate.pii.analyzer")
 
+# Matches the #<uuid4># placeholders produced by SessionStore.add_mapping;
+# restoring with one sub over this pattern is a single pass over the text no
+# matter how many mappings the session holds.
+uuid_placeholder_pattern = re.compile(
+    r"#[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}#"
+)
+
+# Every entity type we ask presidio for (emails, phones, cards, SSNs, IBANs,
+# crypto addresses, ...) contains a digit or an @; text without either cannot
+# match and can skip the NLP pass entirely.
+pii_candidate_pattern = re.compile(r"[0-9@]")
+
+# Entity types requested on every analyze call; credit card detection first
+_ENTITIES = (
+    "PHONE_NUMBER",
+    "EMAIL_ADDRESS",
+    "CRYPTO",
+    "CREDIT_CARD",
+    "IBAN_CODE",
+    "MEDICAL_LICENSE",
+    "US_BANK_NUMBER",
+    "US_ITIN",
+    "US_PASSPORT",
+    "US_SSN",
+    "UK_NHS",
+    "UK_NINO",
+)
+
 
 class PiiAnalyzer:
     """
@@ -30,14 +60,19 @@ class PiiAnalyzer:
     """
 
     _instance: Optional["PiiAnalyzer"] = None
+    _instance_lock = threading.Lock()
     _name = "codegate-pii"
 
     @classmethod
     def get_instance(cls) -> "PiiAnalyzer":
         """Get or create the singleton instance of PiiAnalyzer"""
         if cls._instance is None:
-            logger.debug("Creating new PiiAnalyzer instance")
-            cls._instance = cls()
+            # Double-checked so concurrent first callers cannot both pay the
+            # spaCy model load (~500ms and a large chunk of RAM).
+            with cls._instance_lock:
+                if cls._instance is None:
+                    logger.debug("Creating new PiiAnalyzer instance")
+                    cls._instance = cls()
         return cls._instance
 
     def __init__(self):
@@ -68,26 +103,15 @@ class PiiAnalyzer:
         PiiAnalyzer._instance = self
 
     def analyze(self, text: str, context: Optional[PipelineContext] = None) -> List:
-        # Prioritize credit card detection first
-        entities = [
-            "PHONE_NUMBER",
-            "EMAIL_ADDRESS",
-            "CRYPTO",
-            "CREDIT_CARD",
-            "IBAN_CODE",
-            "MEDICAL_LICENSE",
-            "US_BANK_NUMBER",
-            "US_ITIN",
-            "US_PASSPORT",
-            "US_SSN",
-            "UK_NHS",
-            "UK_NINO",
-        ]
+        # Cheap prefilter: skip the spaCy/recognizer machinery when no
+        # candidate character is present at all
+        if not pii_candidate_pattern.search(text):
+            return []
 
         # Analyze the text for PII with adjusted threshold for credit cards
         analyzer_results = self.analyzer.analyze(
             text=text,
-            entities=entities,
+            entities=_ENTITIES,
             language="en",
             score_threshold=0.3,  # Lower threshold to catch more potential matches
         )
@@ -115,6 +139,7 @@ class PiiAnalyzer:
             )
             return anonymized_text
 
-        for uuid_placeholder, original_pii in session_data.items():
-            anonymized_text = anonymized_text.replace(uuid_placeholder, original_pii)
-        return anonymized_text
+        return uuid_placeholder_pattern.sub(
+            lambda match: session_data.get(match.group(0), match.group(0)),
+            anonymized_text,
+        )
@@ -1,6 +1,8 @@
+import re
+import uuid
+from collections import Counter
 from typing import Any, Dict, List, Optional, Tuple
 
-import regex as re
 import structlog
 
 from codegate.db.models import AlertSeverity
@@ -18,6 +20,43 @@ from codegate.types.openai import UserMessage as OpenaiUserMessage
 
 logger = structlog.get_logger("codegate")
 
+# User message classes across providers; a tuple isinstance dispatches in a
+# single C call
+_USER_MESSAGE_TYPES = (AnthropicUserMessage, OllamaUserMessage, OpenaiUserMessage)
+
+# Matches the #<uuid4># placeholders minted by SessionStore.add_mapping. The
+# fixed-width hex classes locate and validate the UUID in a single pass, so
+# the unredaction scan needs no per-character bookkeeping or separate
+# validation step.
+uuid_marker_pattern = re.compile(r"#[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}#")
+
+# A trailing marker start that may still grow into a complete placeholder once
+# the next chunk arrives. The fixed-width negative lookbehind keeps the closing
+# delimiter of an already-complete marker from being mistaken for a new start.
+partial_marker_pattern = re.compile(
+    r"(?<!#[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})#[0-9a-f-]{0,36}\Z"
+)
+
+
+def _format_pii_summary(pii_details: List[Dict[str, Any]]) -> str:
+    """Format PII details into a readable summary"""
+    # Group PII by type; Counter does the grouping in C and preserves
+    # first-seen order like the plain dict it replaces
+    pii_types = Counter(pii["type"] for pii in pii_details)
+
+    # Format the summary
+    summary_parts = []
+    for pii_type, count in pii_types.items():
+        # Make the type more readable
+        readable_type = pii_type.lower().replace("_", " ")
+        # Add plural 's' if needed
+        if count > 1:
+            summary_parts.append(f"{count} {readable_type}s")
+        else:
+            summary_parts.append(f"{count} {readable_type}")
+    logger.debug(f"PII summary: {summary_parts}")
+    return ", ".join(summary_parts)
+
 
 def can_be_uuid(buffer):
     """
@@ -89,13 +128,19 @@ class CodegatePii(PipelineStep):
         if not pii_details:
             return ""
 
-        # Find the first occurrence of PII and get surrounding context
-        first_pii = min(pii_details, key=lambda x: x["start"])
-        last_pii = max(pii_details, key=lambda x: x["end"])
+        # Find the bounds of all the PII in one pass instead of separate
+        # min()/max() scans with lambda keys
+        first_start = len(message)
+        last_end = 0
+        for pii in pii_details:
+            if pii["start"] < first_start:
+                first_start = pii["start"]
+            if pii["end"] > last_end:
+                last_end = pii["end"]
 
         # Get the text snippet containing all PII
-        start = max(0, first_pii["start"])
-        end = min(len(message), last_pii["end"] + 1)
+        start = max(0, first_start)
+        end = min(len(message), last_end + 1)
 
         return message[start:end]
 
@@ -105,15 +150,29 @@ class CodegatePii(PipelineStep):
         # Track found PII
         found_pii = []
 
-        # Log each found PII instance and anonymize
-        anonymized_text = text
-        for result in results:
+        # Log each found PII instance and anonymize. Presidio hands back the
+        # spans, so splice the placeholders in with a single left-to-right
+        # rebuild instead of one full-text str.replace per result; that also
+        # avoids clobbering unrelated occurrences of short PII substrings.
+        # Longest span first at each start, so an overlapping shorter
+        # detection can never leave the tail of a longer one unredacted
+        parts = []
+        prev_end = 0
+        for result in sorted(results, key=lambda r: (r.start, -r.end)):
+            if result.start < prev_end:
+                # Overlaps a span that was already spliced; the text it covers
+                # is redacted as part of that span, so don't mint a placeholder
+                # or count it
+                continue
+
             pii_value = text[result.start : result.end]
 
             # add to session store
             obj = SensitiveData(original=pii_value, service="pii", type=result.entity_type)
             uuid_placeholder = self.sensitive_data_manager.store(session_id, obj)
-            anonymized_text = anonymized_text.replace(pii_value, uuid_placeholder)
+            parts.append(text[prev_end : result.start])
+            parts.append(uuid_placeholder)
+            prev_end = result.end
 
             # Add to found PII list
             pii_info = {
@@ -126,16 +185,8 @@ class CodegatePii(PipelineStep):
             }
             found_pii.append(pii_info)
 
-            # Log each PII detection with its UUID mapping
-            logger.info(
-                "PII detected and mapped",
-                pii_type=result.entity_type,
-                score=f"{result.score:.2f}",
-                uuid=uuid_placeholder,
-                # Don't log the actual PII value for security
-                value_length=len(pii_value),
-                session_id=session_id,
-            )
+        parts.append(text[prev_end:])
+        anonymized_text = "".join(parts)
 
         # Log summary of all PII found in this analysis
         if found_pii and context:
@@ -151,10 +202,13 @@ class CodegatePii(PipelineStep):
                 severity_category=AlertSeverity.CRITICAL,
             )
 
+            # One aggregated line instead of a log call per detected entity;
+            # structlog serialization is measurable when a message has many
+            # PII instances. Values themselves are never logged.
             logger.info(
                 "PII analysis complete",
                 total_pii_found=len(found_pii),
-                pii_types=[p["type"] for p in found_pii],
+                pii_types=dict(Counter(p["type"] for p in found_pii)),
                 session_id=session_id,
             )
 
@@ -170,9 +224,9 @@ class CodegatePii(PipelineStep):
         for message in request.get_messages():
             for content in message.get_content():
                 # This is where analyze and anonymize the text
-                if content.get_text() is None:
-                    continue
                 original_text = content.get_text()
+                if original_text is None:
+                    continue
                 results = self.analyzer.analyze(original_text, context)
                 if results:
                     pii_details, anonymized_text = self.process_results(
@@ -185,13 +239,8 @@ class CodegatePii(PipelineStep):
                         content.set_text(anonymized_text)
 
                         # If this is a user message, grab the redacted snippet!
-                        if (
-                            # This is suboptimal and should be an
-                            # interface.
-                            isinstance(message, AnthropicUserMessage)
-                            or isinstance(message, OllamaUserMessage)
-                            or isinstance(message, OpenaiUserMessage)
-                        ):
+                        # This is suboptimal and should be an interface.
+                        if isinstance(message, _USER_MESSAGE_TYPES):
                             last_redacted_text = self._get_redacted_snippet(
                                 anonymized_text, pii_details
                             )
@@ -201,6 +250,9 @@ class CodegatePii(PipelineStep):
         # Store the count, details, and redacted text in context metadata
         context.metadata["redacted_pii_count"] = total_pii_found
         context.metadata["redacted_pii_details"] = all_pii_details
+        # Format the notification summary once here; the notifier's
+        # process_chunk runs for every streamed chunk of the response
+        context.metadata["pii_summary"] = _format_pii_summary(all_pii_details)
         context.metadata["redacted_text"] = last_redacted_text
         context.metadata["session_id"] = session_id
 
@@ -212,7 +264,7 @@ class CodegatePii(PipelineStep):
             context.pii_found = True
             context.metadata["sensitive_data_manager"] = self.sensitive_data_manager
 
-        logger.debug(f"Redacted text: {last_redacted_text}")
+        logger.debug("Redacted text", redacted_text=last_redacted_text)
 
         return PipelineResult(request=request, context=context)
 
@@ -249,8 +301,6 @@ class PiiUnRedactionStep(OutputPipelineStep):
     that has been previously redacted using UUID markers.
 
     Attributes:
-        redacted_pattern (re.Pattern): A regex pattern to identify redacted UUID markers.
-        complete_uuid_pattern (re.Pattern): A regex pattern to validate complete UUIDs.
         marker_start (str): The starting marker for redacted UUIDs.
         marker_end (str): The ending marker for redacted UUIDs.
 
@@ -262,10 +312,6 @@ class PiiUnRedactionStep(OutputPipelineStep):
     """
 
     def __init__(self):
-        self.redacted_pattern = re.compile(r"#([0-9a-f-]{0,36})#")
-        self.complete_uuid_pattern = re.compile(
-            r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
-        )  # noqa: E501
         self.marker_start = "#"
         self.marker_end = "#"
 
@@ -275,9 +321,17 @@ class PiiUnRedactionStep(OutputPipelineStep):
 
     def _is_complete_uuid(self, uuid_str: str) -> bool:
         """Check if the string is a complete UUID"""
-        return bool(self.complete_uuid_pattern.match(uuid_str))
+        # The length compare short-circuits the common invalid case before
+        # paying for the (C-implemented) uuid parser
+        if len(uuid_str) != 36:
+            return False
+        try:
+            uuid.UUID(uuid_str)
+            return True
+        except ValueError:
+            return False
 
-    async def process_chunk(  # noqa: C901
+    async def process_chunk(
         self,
         chunk: Any,
         context: OutputPipelineContext,
@@ -292,12 +346,21 @@ class PiiUnRedactionStep(OutputPipelineStep):
             logger.error("Could not get any session id, cannot process pii")
             return [chunk]
 
-        chunk_has_text = any(content.get_text() for content in chunk.get_content())
-        if not chunk_has_text:
+        # Materialize the content parts and their text once; get_content() is
+        # a generator and get_text() may build the text for structured blocks
+        contents_with_text = [(content, content.get_text()) for content in chunk.get_content()]
+        if not any(text for _, text in contents_with_text):
             return [chunk]
 
-        for content in chunk.get_content():
-            text = content.get_text()
+        # Placeholders are #uuid# sequences; when no marker character shows up
+        # in this chunk and nothing is buffered from a previous one, the whole
+        # scan below cannot change anything - pass the chunk through untouched
+        if not context.prefix_buffer and not any(
+            text and "#" in text for _, text in contents_with_text
+        ):
+            return [chunk]
+
+        for content, text in contents_with_text:
             if text is None or text == "":
                 # Nothing to do with this content item
                 continue
@@ -307,66 +370,33 @@ class PiiUnRedactionStep(OutputPipelineStep):
                 text = context.prefix_buffer + text
                 context.prefix_buffer = ""
 
-            # Find all potential UUID markers in the content
-            current_pos = 0
-            result = []
-            while current_pos < len(text):
-                start_idx = text.find(self.marker_start, current_pos)
-                if start_idx == -1:
-                    # No more markers!, add remaining content
-                    result.append(text[current_pos:])
-                    break
-
-                end_idx = text.find(self.marker_end, start_idx + 1)
-                if end_idx == -1:
-                    # Incomplete marker, buffer the rest only if it can be a UUID
-                    if start_idx + 1 < len(text) and not can_be_uuid(text[start_idx + 1 :]):
-                        # the buffer can't be a UUID, so we can't process it, just return
-                        result.append(text[current_pos:])
-                    else:
-                        # this can still be a UUID
-                        context.prefix_buffer = text[current_pos:]
-                    break
-
-                # Add text before marker
-                if start_idx > current_pos:
-                    result.append(text[current_pos:start_idx])
-
-                # Extract potential UUID if it's a valid format!
-                uuid_marker = text[start_idx : end_idx + 1]
-                uuid_value = uuid_marker[1:-1]  # Remove # #
-
-                if self._is_complete_uuid(uuid_value):
-                    # Get the PII manager from context metadata
-                    logger.debug(f"Valid UUID found: {uuid_value}")
-                    sensitive_data_manager = (
-                        input_context.metadata.get("sensitive_data_manager")
-                        if input_context
-                        else None
-                    )
-                    if sensitive_data_manager and sensitive_data_manager.session_store:
-                        # Restore original value from PII manager
-                        logger.debug("Attempting to restore PII from UUID marker")
-                        original = sensitive_data_manager.get_original_value(
-                            session_id, uuid_marker
-                        )
-                        logger.debug(f"Restored PII: {original}")
-                        result.append(original)
-                    else:
-                        logger.debug("No PII manager or session found, keeping original marker")
-                        result.append(uuid_marker)
-
+            # Hold back a trailing marker start that may still be completed by
+            # the next chunk, so the substitution below never sees a partial
+            # marker
+            partial = partial_marker_pattern.search(text)
+            if partial is not None and can_be_uuid(text[partial.start() + 1 :]):
+                context.prefix_buffer = text[partial.start() :]
+                text = text[: partial.start()]
+
+            sensitive_data_manager = input_context.metadata.get("sensitive_data_manager")
+
+            def _restore_marker(match: re.Match) -> str:
+                uuid_marker = match.group(0)
+                if sensitive_data_manager and sensitive_data_manager.session_store:
+                    # Restore original value from PII manager
+                    original = sensitive_data_manager.get_original_value(session_id, uuid_marker)
+                    logger.debug("Restored PII from UUID marker", marker=uuid_marker)
+                    if original is not None:
+                        return original
                 else:
-                    # Not a valid UUID, treat as normal text
-                    logger.debug(f"Invalid UUID format: {uuid_value}")
-                    result.append(uuid_marker)
+                    logger.debug("No PII manager or session found, keeping original marker")
+                return uuid_marker
 
-                current_pos = end_idx + 1
-
-            if result:
+            # One sub call fuses the marker scan, the replacement and the
+            # joining of the surrounding text into a single C-level pass
+            final_content = uuid_marker_pattern.sub(_restore_marker, text)
+            if final_content:
                 # Create new chunk with processed content
-                final_content = "".join(result)
-                logger.debug(f"Final processed content: {final_content}")
                 content.set_text(final_content)
                 return [chunk]
 
@@ -393,33 +423,17 @@ class PiiRedactionNotifier(OutputPipelineStep):
         return "pii-redaction-notifier"
 
     def _create_chunk(self, original_chunk: Any, content: str) -> Any:
-        # TODO verify if deep-copy is necessary
+        # The deep copy is necessary: set_text writes through to a nested
+        # model (e.g. choices[0].delta for OpenAI-style chunks), which a
+        # shallow model_copy would share with original_chunk - and we emit the
+        # original right after the notification.
         copy = original_chunk.model_copy(deep=True)
         copy.set_text(content)
         return copy
 
     def _format_pii_summary(self, pii_details: List[Dict[str, Any]]) -> str:
         """Format PII details into a readable summary"""
-        # Group PII by type
-        pii_types = {}
-        for pii in pii_details:
-            pii_type = pii["type"]
-            if pii_type not in pii_types:
-                pii_types[pii_type] = 0
-            pii_types[pii_type] += 1
-
-        # Format the summary
-        summary_parts = []
-        for pii_type, count in pii_types.items():
-            # Make the type more readable
-            readable_type = pii_type.lower().replace("_", " ")
-            # Add plural 's' if needed
-            if count > 1:
-                summary_parts.append(f"{count} {readable_type}s")
-            else:
-                summary_parts.append(f"{count} {readable_type}")
-        logger.debug(f"PII summary: {summary_parts}")
-        return ", ".join(summary_parts)
+        return _format_pii_summary(pii_details)
 
     async def process_chunk(
         self,
@@ -435,22 +449,22 @@ class PiiRedactionNotifier(OutputPipelineStep):
         ):
             return [chunk]
 
-        is_cline_client = any(
-            "Cline" in str(message.trigger_string or "")
-            for message in input_context.alerts_raised or []
-        )
-
         for content in chunk.get_content():
             # This if is a safety check for some SSE protocols
             # (e.g. Anthropic) that have different message types, some
             # of which have empty content and are not meant to be
             # modified.
-            if content.get_text() is None or content.get_text() == "":
+            text = content.get_text()
+            if text is None or text == "":
                 continue
 
             redacted_count = input_context.metadata["redacted_pii_count"]
-            pii_details = input_context.metadata.get("redacted_pii_details", [])
-            pii_summary = self._format_pii_summary(pii_details)
+            # CodegatePii.process caches the formatted summary; only fall back
+            # to formatting when the metadata was populated elsewhere
+            pii_summary = input_context.metadata.get("pii_summary")
+            if pii_summary is None:
+                pii_details = input_context.metadata.get("redacted_pii_details", [])
+                pii_summary = _format_pii_summary(pii_details)
 
             # The following can be uncommented to assist with debugging
             # redacted_text = input_context.metadata.get("redacted_text", "")
@@ -471,7 +485,13 @@ class PiiRedactionNotifier(OutputPipelineStep):
                 f"by redacting them.\n\n"
             )
 
-            # Create notification chunk for cline weirdness
+            # Create notification chunk for cline weirdness. Only scan the
+            # raised alerts here, once we know a notification will be emitted,
+            # rather than for every buffered-empty chunk before it
+            is_cline_client = any(
+                "Cline" in str(message.trigger_string or "")
+                for message in input_context.alerts_raised or []
+            )
             if is_cline_client:
                 notification_chunk = self._create_chunk(
                     chunk,
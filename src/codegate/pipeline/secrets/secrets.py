@@ -18,6 +18,10 @@ from codegate.pipeline.sensitive_data.manager import SensitiveData, SensitiveDat
 
 logger = structlog.get_logger("codegate")
 
+# Fixed-width mask used when obfuscating secrets; built once instead of a
+# str.__mul__ allocation per match
+_OBFUSCATED_SECRET = "*" * 32
+
 
 class SecretsModifier:
     """
@@ -227,7 +231,7 @@ class SecretsObfuscator(SecretsModifier):
         Obfuscate the secret value. We use a hardcoded number of asterisks
         to not leak the length of the secret.
         """
-        return "*" * 32
+        return _OBFUSCATED_SECRET
 
     def _notify_secret(
         self, match: Match, code_snippet: Optional[CodeSnippet], protected_text: List[str]
@@ -9,12 +9,19 @@ class SessionStore:
 
     def __init__(self):
         self.sessions: Dict[str, Dict[str, str]] = {}
+        # Reverse index (data -> placeholder) per session so repeated values
+        # reuse one placeholder instead of minting a new UUID per occurrence
+        self._reverse_sessions: Dict[str, Dict[str, str]] = {}
 
     def add_mapping(self, session_id: str, data: str) -> str:
+        reverse = self._reverse_sessions.setdefault(session_id, {})
+        existing_placeholder = reverse.get(data)
+        if existing_placeholder is not None:
+            return existing_placeholder
+
         uuid_placeholder = f"#{str(uuid.uuid4())}#"
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {}
-        self.sessions[session_id][uuid_placeholder] = data
+        self.sessions.setdefault(session_id, {})[uuid_placeholder] = data
+        reverse[data] = uuid_placeholder
         return uuid_placeholder
 
     def get_by_session_id(self, session_id: str) -> Optional[Dict]:
@@ -27,7 +34,10 @@ class SessionStore:
         """Clears all stored mappings for a specific session."""
         if session_id in self.sessions:
             del self.sessions[session_id]
+        if session_id in self._reverse_sessions:
+            del self._reverse_sessions[session_id]
 
     def cleanup(self):
         """Clears all stored mappings for all sessions."""
         self.sessions.clear()
+        self._reverse_sessions.clear()
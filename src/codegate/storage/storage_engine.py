@@ -242,8 +242,9 @@ class StorageEngine:
                 # except @, /, . and -
                 cleaned_query = non_alphanumeric_pattern.sub(" ", cleaned_query)
 
-                # Tokenize the cleaned query
-                query_words = cleaned_query.split()
+                # Tokenize the cleaned query; a set makes the per-row
+                # membership check below a hashed lookup instead of a scan
+                query_words = frozenset(cleaned_query.split())
 
             for row in rows:
                 # Only keep the packages that explicitly appear in the query
@@ -220,14 +220,18 @@ class ChatCompletionRequest(pydantic.BaseModel):
         return self.messages[0]
 
     def last_user_message(self) -> tuple[Message, int] | None:
-        for idx, msg in enumerate(reversed(self.messages)):
+        messages = self.messages
+        last = len(messages) - 1
+        for idx, msg in enumerate(reversed(messages)):
             if isinstance(msg, UserMessage):
-                return msg, len(self.messages) - 1 - idx
+                return msg, last - idx
 
     def last_user_block(self) -> Iterable[tuple[Message, int]]:
-        for idx, msg in enumerate(reversed(self.messages)):
+        messages = self.messages
+        last = len(messages) - 1
+        for idx, msg in enumerate(reversed(messages)):
             if isinstance(msg, UserMessage):
-                yield msg, len(self.messages) - 1 - idx
+                yield msg, last - idx
 
     def get_system_prompt(self) -> Iterable[str]:
         if isinstance(self.system, str):
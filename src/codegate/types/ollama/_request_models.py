@@ -114,6 +114,10 @@ Message = Union[
     ToolMessage,
 ]
 
+# Built once so the per-request message scan does not reconstruct the tuple
+# on every message.
+_USER_BLOCK_MESSAGES = (UserMessage, ToolMessage)
+
 
 class ChatRequest(pydantic.BaseModel):
     model: str
@@ -152,14 +156,18 @@ class ChatRequest(pydantic.BaseModel):
         return self.messages[0]
 
     def last_user_message(self) -> tuple[Message, int] | None:
-        for idx, msg in enumerate(reversed(self.messages)):
+        messages = self.messages
+        last = len(messages) - 1
+        for idx, msg in enumerate(reversed(messages)):
             if isinstance(msg, UserMessage):
-                return msg, len(self.messages) - 1 - idx
+                return msg, last - idx
 
     def last_user_block(self) -> Iterable[tuple[Message, int]]:
-        for idx, msg in enumerate(reversed(self.messages)):
-            if isinstance(msg, (UserMessage, ToolMessage)):
-                yield msg, len(self.messages) - 1 - idx
+        messages = self.messages
+        last = len(messages) - 1
+        for idx, msg in enumerate(reversed(messages)):
+            if isinstance(msg, _USER_BLOCK_MESSAGES):
+                yield msg, last - idx
             elif isinstance(msg, SystemMessage):
                 # these can occur in the middle of a user block
                 continue
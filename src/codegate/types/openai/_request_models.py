@@ -311,6 +311,12 @@ Message = Union[
     FunctionMessage,
 ]
 
+# Role groups used by the per-request message scans. Built once so the hot
+# loops do not reconstruct the tuples on every message.
+_USER_BLOCK_MESSAGES = (UserMessage, ToolMessage)
+_MID_BLOCK_MESSAGES = (SystemMessage, DeveloperMessage)
+_RESPONSE_MESSAGES = (AssistantMessage, FunctionMessage)
+
 
 class ChatCompletionRequest(pydantic.BaseModel):
     messages: List[Message]
@@ -373,18 +379,22 @@ class ChatCompletionRequest(pydantic.BaseModel):
         return self.messages[0] if len(self.messages) > 0 else None
 
     def last_user_message(self) -> tuple[Message, int] | None:
-        for idx, msg in enumerate(reversed(self.messages)):
+        messages = self.messages
+        last = len(messages) - 1
+        for idx, msg in enumerate(reversed(messages)):
             if isinstance(msg, UserMessage):
-                return msg, len(self.messages) - 1 - idx
+                return msg, last - idx
 
     def last_user_block(self) -> Iterable[tuple[Message, int]]:
-        for idx, msg in enumerate(reversed(self.messages)):
-            if isinstance(msg, (UserMessage, ToolMessage)):
-                yield msg, len(self.messages) - 1 - idx
-            elif isinstance(msg, (SystemMessage, DeveloperMessage)):
+        messages = self.messages
+        last = len(messages) - 1
+        for idx, msg in enumerate(reversed(messages)):
+            if isinstance(msg, _USER_BLOCK_MESSAGES):
+                yield msg, last - idx
+            elif isinstance(msg, _MID_BLOCK_MESSAGES):
                 # these can occur in the middle of a user block
                 continue
-            elif isinstance(msg, (AssistantMessage, FunctionMessage)):
+            elif isinstance(msg, _RESPONSE_MESSAGES):
                 # these are LLM responses, end of user input, break on them
                 break
 
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import structlog
 import tree_sitter_go as tsgo
 import tree_sitter_java as tsjava
@@ -71,25 +73,35 @@ class PackageExtractor:
                         (use_as_clause (scoped_identifier) @import_name))
                 """,
     }
+    # Queries are compiled once at import; compiling per call dominated the
+    # extraction cost for small snippets.
+    __compiled_queries = {
+        "javascript": __languages["javascript"].query(__queries["javascript"]),
+        "go": __languages["go"].query(__queries["go"]),
+        "python": __languages["python"].query(__queries["python"]),
+        "java": __languages["java"].query(__queries["java"]),
+        "rust": __languages["rust"].query(__queries["rust"]),
+    }
 
     @staticmethod
     def extract_packages(code: str, language_name: str) -> list[str]:
         if (code is None) or (language_name is None):
             return []
+        return list(PackageExtractor._extract_packages_cached(code, language_name.lower()))
 
-        language_name = language_name.lower()
-
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_packages_cached(code: str, language_name: str) -> tuple[str, ...]:
         if language_name not in PackageExtractor.__languages.keys():
-            return []
+            return ()
 
-        language = PackageExtractor.__languages[language_name]
         parser = PackageExtractor.__parsers[language_name]
 
         # Create tree
         tree = parser.parse(bytes(code, "utf8"))
 
-        # Create query for imports
-        query = language.query(PackageExtractor.__queries[language_name])
+        # Use the pre-compiled query for imports
+        query = PackageExtractor.__compiled_queries[language_name]
 
         # Execute query
         all_captures = query.captures(tree.root_node)
@@ -114,4 +126,4 @@ class PackageExtractor:
 
                 imports.add(import_lib)
 
-        return list(imports)
+        return tuple(imports)